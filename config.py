@@ -1,4 +1,10 @@
 # config.py
+# Shared constants for the tract explorer and the archived county
+# analyzer, so the two entry scripts can't drift apart.
+NO_DATA_VALUE = -999
+CDC_PRIMARY_COLOR = '#0071BC'
+CDC_SECONDARY_COLOR = '#666666'
+
 INDICATOR_DESCRIPTIONS = {
         "STATEFP": "State FIPS code",
         "COUNTYFP": "County FIPS number",
@@ -1,17 +1,21 @@
 import streamlit as st
 import pandas as pd
-import altair as alt
 import numpy as np
-import matplotlib.pyplot as plt
-import geopandas as gpd
 import json
 import os
+
+# pydeck and pyogrio are imported lazily inside the functions that need
+# them; they cost hundreds of ms at cold start and aren't needed until
+# their tab/feature is actually rendered.
 from config import INDICATOR_DESCRIPTIONS
 
 st.set_page_config(page_title="CDC Environmental Justice Index Tract Explorer", layout="wide")
 
-# Enhanced CSS with improved spacing and hierarchy
-st.markdown("""
+# CSS built once at import; Streamlit's render model still requires the
+# markdown element to be emitted each rerun or it disappears, but the
+# string itself is a constant and only carries rules that match live
+# widgets.
+APP_CSS = """
 <style>
     h1,h2,h3 { color: #0071BC }
     .stDownloadButton>button {
@@ -27,17 +31,10 @@ st.markdown("""
         border-radius: 5px;
         margin-top: 0.5rem;
     }
-    div[data-testid="stCheckbox"] { 
+    div[data-testid="stCheckbox"] {
         padding: 4px 0;
     }
     .stSidebar [data-testid="stMarkdownContainer"] { font-size: 14px }
-    .sidebar-category {
-        background-color: #f8f9fa;
-        padding: 10px;
-        border-radius: 5px;
-        margin: 10px 0;
-        border-left: 4px solid #0071BC;
-    }
     .stTabs [data-baseweb="tab-list"] {
         gap: 8px;
     }
@@ -51,7 +48,40 @@ st.markdown("""
         color: white;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# Vega-Lite spec for the comparison chart, written out once as plain
+# JSON; rerenders skip Altair's Python-side spec build and schema
+# validation entirely. Height is filled in per selection size.
+COMPARISON_SPEC = {
+    "mark": "bar",
+    "width": 700,
+    "encoding": {
+        "y": {
+            "field": "Location", "type": "nominal", "title": None,
+            "axis": {"labelLimit": 200, "labelAngle": 0}
+        },
+        "x": {
+            "field": "Percentile", "type": "quantitative",
+            "title": "Risk Level (percentile)", "scale": {"domain": [0, 100]}
+        },
+        "color": {
+            "field": "Location", "type": "nominal",
+            "legend": {"title": "Selected Areas", "orient": "top", "columns": 3}
+        },
+        "row": {
+            "field": "Indicator", "type": "nominal", "title": None,
+            "header": {"labelAngle": 0, "labelAlign": "left", "labelLimit": 300}
+        },
+        "tooltip": [
+            {"field": "Location", "type": "nominal"},
+            {"field": "Indicator", "type": "nominal"},
+            {"field": "Percentile", "type": "quantitative", "title": "Risk Level", "format": ".1f"}
+        ]
+    }
+}
 
 OVERALL_INDICES = {
     "RPL_EJI": "Overall Environmental Justice Index",
@@ -70,7 +100,7 @@ EJI_VARIABLE_GROUPS = {
             "EPL_NPL": "Proximity to Superfund Sites", 
             "EPL_TRI": "Proximity to Toxic Release Sites", 
             "EPL_RMP": "Proximity to Risk Management Facilities", 
-            "EPL_TSDF": "Proximity to Treatment/Storage/Disposal Facilities"
+            "EPL_TSD": "Proximity to Treatment/Storage/Disposal Facilities"
         },
         "Built Environment": {
             "EPL_PARK": "Access to Green Space", 
@@ -106,29 +136,148 @@ EJI_VARIABLE_GROUPS = {
     }
 }
 
+# The group structure is static, so flatten it once at import time into
+# a (group, subgroup, code, name) tuple table; paths that don't care
+# about grouping derive from this instead of re-walking the nested dict.
+EJI_VARIABLES_FLAT = tuple(
+    (group_name, subgroup_name, var_code, var_name)
+    for group_name, group_content in EJI_VARIABLE_GROUPS.items()
+    for subgroup_name, variables in group_content.items()
+    for var_code, var_name in variables.items()
+)
+
+ALL_VARIABLES = {var_code: var_name for _, _, var_code, var_name in EJI_VARIABLES_FLAT}
+
+def get_all_variables():
+    return ALL_VARIABLES
+
+# Column sets for loading are likewise static; no need to rebuild them
+# inside the cached loader on every cold start.
+KEY_COLUMNS = ['AFFGEOID', 'StateDesc', 'STATEFP', 'COUNTY', 'Location']
+INDICATOR_COLUMNS = list(OVERALL_INDICES) + list(ALL_VARIABLES)
+
 @st.cache_data
 def load_data():
-    df = pd.read_csv('data/CDC_EJI_US.csv').replace(-999, np.nan)
-    numeric_cols = [col for col in df.columns if col.startswith(('E_', 'EP_', 'EPL_', 'SPL_', 'RPL_', 'F_'))]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    df['GEOID'] = df['AFFGEOID'].str[-11:]
+    key_cols = KEY_COLUMNS
+    indicator_cols = INDICATOR_COLUMNS
+    csv_path = 'data/CDC_EJI_US.csv'
+    parquet_path = 'data/CDC_EJI_US.parquet'
+    # Use the Parquet cache only while it's at least as fresh as the CSV;
+    # a re-downloaded EJI release falls back to the CSV until the
+    # converter is rerun.
+    parquet_fresh = (
+        os.path.exists(parquet_path)
+        and (not os.path.exists(csv_path)
+             or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path))
+    )
+    if parquet_fresh:
+        # Columnar read of only the columns the app uses; dtypes and GEOID
+        # are baked in by scripts/convert_to_parquet.py so no re-coercion
+        # is needed here.
+        df = pd.read_parquet(parquet_path, columns=key_cols + ['GEOID'] + indicator_cols, engine='pyarrow')
+    else:
+        # Fallback CSV parse (run scripts/convert_to_parquet.py once to skip
+        # it). PyArrow's multithreaded reader parses only the needed columns,
+        # folding the -999 sentinel and the float32 cast into the parse
+        # itself, so no replace/to_numeric passes afterwards.
+        df = pd.read_csv(
+            csv_path,
+            engine='pyarrow',
+            usecols=key_cols + indicator_cols,
+            dtype={col: 'float32' for col in indicator_cols},
+            na_values=['-999', '-999.0']
+        )
+        df['GEOID'] = df['AFFGEOID'].str.slice(-11)
+    # Low-cardinality grouping keys; makes state comparisons int8-cheap.
+    df['StateDesc'] = df['StateDesc'].astype('category')
+    df['STATEFP'] = df['STATEFP'].astype('category')
     return df
 
+@st.cache_data
+def get_state_options():
+    # The categorical cast in load_data keeps categories lexically
+    # sorted, so this is a pointer read plus one tuple build, cached.
+    return tuple(load_data()['StateDesc'].cat.categories)
+
+@st.cache_resource
+def get_state_row_indices():
+    # state -> ndarray of row positions, computed once; per-state slicing
+    # becomes a take() instead of an O(N) boolean mask per rerun.
+    return load_data().groupby('StateDesc', sort=False, observed=True).indices
+
+@st.cache_data
+def get_state_data(selected_state):
+    # Cached per state so reruns (widget clicks, tab switches) reuse the
+    # filtered slice instead of re-scanning the national frame.
+    return load_data().take(get_state_row_indices()[selected_state])
+
+@st.cache_data(show_spinner=False)
+def build_display_df(selected_state, var_items):
+    # var_items is a tuple of (code, name) pairs so the cache key stays
+    # hashable. Scaling and sorting happen once per (state, selection);
+    # reruns just render the cached frame.
+    state_data = get_state_data(selected_state)
+    # .copy() detaches the projection from state_data so the scaling
+    # assignment below doesn't trip SettingWithCopyWarning under
+    # non-CoW pandas.
+    display_df = state_data[[code for code, _ in var_items]].copy()
+    display_df.columns = [name for _, name in var_items]
+
+    numeric_cols = [col for col in display_df.columns if col not in ['Census Tract ID', 'Location']]
+    display_df[numeric_cols] = (display_df[numeric_cols] * 100).round(1)
+    sort_col = 'Overall Environmental Justice Index'
+    if sort_col not in numeric_cols:
+        sort_col = numeric_cols[0]
+    return display_df.sort_values(sort_col, ascending=False, kind='stable')
+
+@st.cache_data(show_spinner=False)
+def build_comparison_long(comparison_df):
+    # Long-form frame for the comparison chart, built from contiguous
+    # NumPy buffers (tile/repeat) instead of DataFrame.melt, and cached
+    # per selection.
+    value_cols = [col for col in comparison_df.columns if col not in ['Census Tract ID', 'Location']]
+    values = comparison_df[value_cols].to_numpy(dtype='float32')
+    n_rows = len(comparison_df)
+    return pd.DataFrame({
+        'Location': np.tile(comparison_df['Location'].to_numpy(), len(value_cols)),
+        'Indicator': np.repeat(np.asarray(value_cols, dtype=object), n_rows),
+        'Percentile': values.T.reshape(-1)
+    })
+
+@st.cache_data(show_spinner=False)
+def frame_to_csv_bytes(df):
+    # Keyed by the frame's content hash, so the CSV is only re-serialized
+    # when the selection actually changes, not on every rerun.
+    return df.to_csv(index=False).encode()
+
 @st.cache_data
 def load_and_preprocess_geojson(state_fips):
+    import pyogrio
     try:
-        state_dir = f"data/tracts/state_{str(state_fips).zfill(2)}"
-        if not os.path.exists(state_dir):
-            st.error(f"No boundary data available for this state (FIPS code {state_fips})")
-            return None
-            
-        shapefile = [f for f in os.listdir(state_dir) if f.endswith('.shp')]
-        if not shapefile:
-            st.error(f"No shapefile found in {state_dir}")
-            return None
-        shapefile = shapefile[0]
-        gdf = gpd.read_file(os.path.join(state_dir, shapefile))
+        state_code = str(state_fips).zfill(2)
+        # Prefer the pre-simplified FlatGeobuf asset written by
+        # scripts/simplify_tracts.py; it is a single binary read with far
+        # fewer vertices than the raw Census shapefile.
+        fgb_path = f"data/tracts/state_{state_code}.fgb"
+        if os.path.exists(fgb_path):
+            boundary_path = fgb_path
+        else:
+            state_dir = f"data/tracts/state_{state_code}"
+            if not os.path.exists(state_dir):
+                st.error(f"No boundary data available for this state (FIPS code {state_fips})")
+                return None
+            shapefile = [f for f in os.listdir(state_dir) if f.endswith('.shp')]
+            if not shapefile:
+                st.error(f"No shapefile found in {state_dir}")
+                return None
+            boundary_path = os.path.join(state_dir, shapefile[0])
+        # pyogrio's bulk Arrow reader is much faster than the row-by-row
+        # Fiona path; only the two columns used downstream are materialized.
+        gdf = pyogrio.read_dataframe(
+            boundary_path,
+            use_arrow=True,
+            columns=['GEOID', 'geometry']
+        )
         gdf['id'] = gdf['GEOID']
         return gdf
 
@@ -136,36 +285,74 @@ def load_and_preprocess_geojson(state_fips):
         st.error(f"Error loading and processing tract boundaries: {str(e)}")
         return None
 
-def get_all_variables():
-    all_vars = {}
-    for g_content in EJI_VARIABLE_GROUPS.values():
-        if isinstance(g_content, dict):
-            for s_content in g_content.values():
-                if isinstance(s_content, dict): 
-                    all_vars.update(s_content)
-                else: 
-                    all_vars.update({k: v for k, v in g_content.items() if not isinstance(v, dict)})
-        else: 
-            all_vars[g_content] = g_content
-    return all_vars
-
-def create_tract_map(data, var_code, var_name, gdf):
+# 256-entry YlOrRd-style RGB lookup table, interpolated once at import;
+# percentile-to-color becomes a single vectorized array index.
+_COLOR_ANCHORS = np.array(
+    [[255, 255, 178], [254, 204, 92], [253, 141, 60], [240, 59, 32], [189, 0, 38]],
+    dtype=np.float32
+)
+
+def _build_color_lut():
+    steps = np.linspace(0, len(_COLOR_ANCHORS) - 1, 256)
+    idx = np.minimum(np.floor(steps).astype(int), len(_COLOR_ANCHORS) - 2)
+    frac = (steps - idx)[:, None]
+    rgb = _COLOR_ANCHORS[idx] * (1 - frac) + _COLOR_ANCHORS[idx + 1] * frac
+    return np.round(rgb).astype(np.uint8)
+
+COLOR_LUT = _build_color_lut()
+
+@st.cache_data(max_entries=32)
+def build_tract_geojson(selected_state, var_code):
+    # GeoJSON + view bounds for one (state, variable) pair, cached so
+    # switching back to a previously viewed map is instant.
+    state_data = get_state_data(selected_state)
+    if not state_data[var_code].notna().any():
+        return None
+    gdf = load_and_preprocess_geojson(state_data['STATEFP'].iloc[0])
     if gdf is None:
         return None
-    
-    if not data[var_code].notna().any():
+    # Attach the single needed column by GEOID lookup rather than a hash
+    # join; the boundary frame itself stays untouched across variable
+    # switches.
+    val_by_geoid = dict(zip(state_data['GEOID'].to_numpy(), state_data[var_code].to_numpy()))
+    gdf = gdf.assign(value=gdf['GEOID'].map(val_by_geoid).astype('float32'))
+    gdf = gdf[gdf['value'].notna()]
+    lut_idx = np.clip(gdf['value'].to_numpy(np.float32) * 255, 0, 255).astype(np.uint8)
+    gdf = gdf.assign(fill_color=[[int(r), int(g), int(b), 180] for r, g, b in COLOR_LUT[lut_idx]])
+    geojson = json.loads(gdf[['GEOID', 'value', 'fill_color', 'geometry']].to_json())
+    bounds = tuple(gdf.total_bounds)
+    return geojson, bounds
+
+def create_tract_map(selected_state, var_code, var_name):
+    import pydeck as pdk
+    result = build_tract_geojson(selected_state, var_code)
+    if result is None:
         st.error("No data available to plot for selected variable")
         return None
-    
-    merged_data = gdf.merge(data, left_on='GEOID', right_on='GEOID')
-    
-    fig, ax = plt.subplots(1, 1, figsize=(2.5, 1.5))  # Reduced figure size
-    merged_data.plot(column=var_code, cmap='YlOrRd', linewidth=0.1, ax=ax, edgecolor='0.8', vmin=0, vmax=1, legend=True)
-    ax.set_title(f"{var_name}", fontsize=10)
-    ax.set_axis_off()
-    
-    plt.tight_layout()
-    return fig
+    geojson, (minx, miny, maxx, maxy) = result
+
+    extent = max(maxx - minx, maxy - miny, 0.1)
+    view_state = pdk.ViewState(
+        latitude=(miny + maxy) / 2,
+        longitude=(minx + maxx) / 2,
+        zoom=float(np.clip(np.log2(360 / extent) - 0.5, 3, 10))
+    )
+    # Fill colors are precomputed via the YlOrRd LUT and cached with the
+    # GeoJSON; deck.gl only reads them back per feature.
+    layer = pdk.Layer(
+        'GeoJsonLayer',
+        geojson,
+        get_fill_color='properties.fill_color',
+        get_line_color=[128, 128, 128, 100],
+        line_width_min_pixels=0.5,
+        pickable=True
+    )
+    return pdk.Deck(
+        layers=[layer],
+        initial_view_state=view_state,
+        map_style='light',
+        tooltip={'html': '<b>Tract {GEOID}</b><br/>' + f'{var_name}: ' + '{value}'}
+    )
 
 def render_variable_selector():
     st.sidebar.header("Select Variables to Display")
@@ -175,35 +362,26 @@ def render_variable_selector():
     if st.sidebar.checkbox("Select All Variables", False):
         return {**selected_vars, **get_all_variables()}
     
+    # One multiselect per subgroup instead of ~25 checkboxes: far fewer
+    # widgets for Streamlit to diff on every rerun.
     for group_name, group_content in EJI_VARIABLE_GROUPS.items():
         with st.sidebar.expander(f"📊 {group_name}", False):
-            st.markdown(f'<div class="sidebar-category">', unsafe_allow_html=True)
-            if isinstance(group_content, dict):
-                for subgroup_name, variables in group_content.items():
-                    st.markdown(f"**{subgroup_name}**")
-                    cols = st.columns(2)
-                    with cols[0]:
-                        if isinstance(variables, dict):
-                            for var_code, var_name in list(variables.items())[::2]:
-                                if st.checkbox(var_name, key=var_code):
-                                    selected_vars[var_code] = var_name
-                    with cols[1]:
-                        if isinstance(variables, dict):
-                            for var_code, var_name in list(variables.items())[1::2]:
-                                if st.checkbox(var_name, key=var_code):
-                                    selected_vars[var_code] = var_name
-            st.markdown('</div>', unsafe_allow_html=True)
-            st.markdown("---")
+            for subgroup_name, variables in group_content.items():
+                picked = st.multiselect(
+                    subgroup_name,
+                    options=list(variables),
+                    format_func=lambda code, names=variables: names[code],
+                    key=f"vars_{subgroup_name}"
+                )
+                selected_vars.update({code: variables[code] for code in picked})
     return selected_vars
 
-def render_map_tab(state_data, selected_map_var, map_var_options, gdf):
-    #st.markdown('<div style="height: 2.5vh; overflow: hidden;">', unsafe_allow_html=True)
+def render_map_tab(state_data, selected_state, selected_map_var, map_var_options):
     with st.container(border=True):
-        fig = create_tract_map(state_data, selected_map_var, map_var_options[selected_map_var], gdf)
-        if fig is not None:
-            st.pyplot(fig)
-        st.markdown('</div>', unsafe_allow_html=True)
-        
+        deck = create_tract_map(selected_state, selected_map_var, map_var_options[selected_map_var])
+        if deck is not None:
+            st.pydeck_chart(deck)
+
         st.markdown("""
         **Map Legend:**
         - Darker colors indicate higher percentile values
@@ -213,27 +391,26 @@ def render_map_tab(state_data, selected_map_var, map_var_options, gdf):
 
     with col1:
         st.markdown("### Top 5 Census Tracts")
-        top_tracts = state_data.sort_values(selected_map_var, ascending=False).head(5)
-        top_tracts = top_tracts[['Location', selected_map_var]].copy()
+        # nlargest/nsmallest select the 5 rows without sorting the whole slice
+        top_tracts = state_data.nlargest(5, selected_map_var)[['Location', selected_map_var]]
         top_tracts.columns = ['Location', 'Risk Level (percentile)']
         st.table(top_tracts)
         
     with col2:
         st.markdown("### Bottom 5 Census Tracts")
-        bottom_tracts = state_data.sort_values(selected_map_var, ascending=True).head(5)
-        bottom_tracts = bottom_tracts[['Location', selected_map_var]].copy()
+        bottom_tracts = state_data.nsmallest(5, selected_map_var)[['Location', selected_map_var]]
         bottom_tracts.columns = ['Location', 'Risk Level (percentile)']
         st.table(bottom_tracts)
 
-# Main app
-df = load_data()
+# Main app (warms the data cache up front)
+load_data()
 
 st.title("CDC Environmental Justice Index Tract Explorer")
 st.markdown("Explore census tract-level environmental justice indicators across states.")
 st.markdown("The Environmental Justice Index (EJI) is a composite measure that combines environmental, social, and health vulnerability indicators. Higher percentile values indicate a greater potential for environmental injustice.")
 
 # Enhanced state selector with search
-state_options = sorted(df['StateDesc'].unique())
+state_options = get_state_options()
 selected_state = st.selectbox(
     "Select a State",
     state_options,
@@ -244,9 +421,8 @@ selected_state = st.selectbox(
 
 selected_vars = render_variable_selector()
 
-state_data = df[df['StateDesc'] == selected_state].copy()
+state_data = get_state_data(selected_state)
 available_vars = {k: v for k, v in selected_vars.items() if k in state_data.columns}
-gdf = load_and_preprocess_geojson(state_data['STATEFP'].iloc[0])
 
 if len(available_vars) > 1:
     tab1, tab2, tab3 = st.tabs(["🗺️ Census Tract Map", "📊 Data Table", "🔍 Area Comparison"])
@@ -258,26 +434,23 @@ if len(available_vars) > 1:
             options=list(map_var_options.keys()),
             format_func=lambda x: map_var_options[x] if map_var_options else None
         )
-        render_map_tab(state_data, selected_map_var, map_var_options, gdf)
+        render_map_tab(state_data, selected_state, selected_map_var, map_var_options)
     
     with tab2:
         st.markdown("### Census Tract Data Table")
         st.markdown("This table displays the percentile ranking for each selected indicator across all census tracts in the chosen state.")
-        display_df = state_data[list(available_vars.keys())].copy()
-        display_df.columns = list(available_vars.values())
-        
+        display_df = build_display_df(selected_state, tuple(available_vars.items()))
         numeric_cols = [col for col in display_df.columns if col not in ['Census Tract ID', 'Location']]
-        for col in numeric_cols:
-            display_df[col] = (pd.to_numeric(display_df[col], errors='coerce') * 100).round(1)
-        
+
         column_config = {
             "Location": st.column_config.TextColumn("Location", width="medium"),
             "Census Tract ID": st.column_config.TextColumn("Census Tract ID", width="medium")
         }
+        code_by_name = {v: k for k, v in selected_vars.items()}
         column_config.update({
             col: st.column_config.ProgressColumn(
                 col,
-                help=INDICATOR_DESCRIPTIONS.get(next(k for k, v in selected_vars.items() if v == col), ""),
+                help=INDICATOR_DESCRIPTIONS.get(code_by_name[col], ""),
                 format="%d%%",
                 min_value=0,
                 max_value=100
@@ -285,7 +458,7 @@ if len(available_vars) > 1:
         })
         
         st.dataframe(
-            display_df.sort_values(numeric_cols[0], ascending=False),
+            display_df,
             column_config=column_config,
             hide_index=True,
             use_container_width=True
@@ -314,25 +487,13 @@ if len(available_vars) > 1:
                         st.caption(tract)
             
             st.subheader("Comparative Analysis")
-            comparison_long = comparison_df.melt(
-                id_vars=['Location'],
-                value_vars=[col for col in comparison_df.columns if col not in ['Census Tract ID', 'Location']],
-                var_name='Indicator',
-                value_name='Percentile'
-            )
-            
-            chart = alt.Chart(comparison_long).mark_bar().encode(
-                y=alt.Y('Location:N', title=None, axis=alt.Axis(labelLimit=200, labelAngle=0)),
-                x=alt.X('Percentile:Q', title='Risk Level (percentile)', scale=alt.Scale(domain=[0, 100])),
-                color=alt.Color('Location:N', legend=alt.Legend(title="Selected Areas", orient="top", columns=3)),
-                row=alt.Row('Indicator:N', title=None, header=alt.Header(labelAngle=0, labelAlign='left', labelLimit=300)),
-                tooltip=['Location', 'Indicator', alt.Tooltip('Percentile:Q', title='Risk Level', format='.1f')]
-            ).properties(width=700, height=max(40, min(80, 400/len(selected_tracts))))
-            
-            st.altair_chart(chart)
+            comparison_long = build_comparison_long(comparison_df)
+
+            spec = {**COMPARISON_SPEC, "height": max(40, min(80, 400 / len(selected_tracts)))}
+            st.vega_lite_chart(comparison_long, spec)
             st.download_button(
                 "Download Comparison Data (CSV)",
-                comparison_df.to_csv(index=False),
+                frame_to_csv_bytes(comparison_df),
                 f"{selected_state}_tract_comparison.csv",
                 "text/csv"
             )
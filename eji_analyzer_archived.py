@@ -1,16 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
 from typing import List, Dict
 import io
-from config import INDICATOR_DESCRIPTIONS  # Import from config.py
-from scipy import stats
+from config import INDICATOR_DESCRIPTIONS, NO_DATA_VALUE, CDC_PRIMARY_COLOR, CDC_SECONDARY_COLOR  # Import from config.py
 
-# --- CONSTANTS ---
-NO_DATA_VALUE = -999
-CDC_PRIMARY_COLOR = '#0071BC'
-CDC_SECONDARY_COLOR = '#666666'
+# Reverse lookup built once at import; a few descriptions are shared by
+# an SPL_/RPL_ pair, so each maps to the list of matching codes to keep
+# the old scan-all-items behavior.
+CODES_BY_DESCRIPTION: Dict[str, List[str]] = {}
+for _code, _desc in INDICATOR_DESCRIPTIONS.items():
+    CODES_BY_DESCRIPTION.setdefault(_desc, []).append(_code)
 
 # --- DATA LOADING AND PREPROCESSING ---
 @st.cache_data
@@ -25,14 +25,20 @@ def load_and_preprocess_data(file_path: str) -> pd.DataFrame:
         st.error(f"An error occurred while reading the file: {e}")
         return pd.DataFrame()
 
-    # Replace no data value with NaN
-    df = df.replace(NO_DATA_VALUE, np.nan)
-
-    # Convert relevant columns to numeric, handling non-numeric data
-    columns_to_convert = list(INDICATOR_DESCRIPTIONS.keys())
-    for col in columns_to_convert:
-        if col in df.columns:
-              df[col] = pd.to_numeric(df[col], errors='coerce') # Coerce errors to NaN
+    # Coerce indicator columns to numeric in one block op, coercing
+    # errors to NaN
+    columns_to_convert = [col for col in INDICATOR_DESCRIPTIONS if col in df.columns]
+    df[columns_to_convert] = df[columns_to_convert].apply(pd.to_numeric, errors='coerce')
+
+    # Mask the -999 no-data sentinel and downcast on the indicator value
+    # columns only; percentile ranks don't need float64, and float32
+    # halves the memory moved through normalization and TOPSIS.
+    # Identifier columns (GEOID, FIPS codes) stay at their exact integer
+    # dtypes — tract GEOIDs overflow float32's 24-bit mantissa.
+    value_cols = [col for col in columns_to_convert
+                  if col.startswith(('E_', 'EP_', 'EPL_', 'SPL_', 'RPL_', 'F_'))]
+    values = df[value_cols]
+    df[value_cols] = values.mask(values.eq(NO_DATA_VALUE)).astype('float32')
     return df
 
 def normalize_data(df: pd.DataFrame, selected_indicators: List[str]) -> pd.DataFrame:
@@ -40,9 +46,14 @@ def normalize_data(df: pd.DataFrame, selected_indicators: List[str]) -> pd.DataF
     if not selected_indicators:
         return pd.DataFrame()
 
-    scaler = MinMaxScaler()
     try:
-         df[selected_indicators] = scaler.fit_transform(df[selected_indicators])
+         # Plain (x - min) / (max - min) over the float32 matrix; a
+         # constant column scales to 0 instead of dividing by zero
+         matrix = df[selected_indicators].to_numpy(np.float32)
+         col_min = np.nanmin(matrix, axis=0)
+         col_max = np.nanmax(matrix, axis=0)
+         col_range = np.where(col_max == col_min, 1, col_max - col_min)
+         df[selected_indicators] = (matrix - col_min) / col_range
     except Exception as e:
          st.error(f"An error occurred during normalization: {e}")
          return pd.DataFrame()
@@ -67,22 +78,23 @@ def topsis(df: pd.DataFrame, selected_indicators: List[str]) -> pd.DataFrame:
 
 
     try:
-        # Apply equal weights to all selected indicators.
-        weights = {indicator: 1 for indicator in selected_indicators}
-
-        # Calculate weighted normalized matrix
-        weighted_matrix = df[selected_indicators].mul(list(weights.values()))
+        # All indicators carry equal weight, so the weighted matrix is the
+        # raw float32 ndarray; working in NumPy avoids the intermediate
+        # frames pandas would allocate for each distance pass.
+        matrix = df[selected_indicators].to_numpy(dtype=np.float32)
 
-        # Determine ideal best and worst
-        ideal_best = weighted_matrix.max(axis=0)
-        ideal_worst = weighted_matrix.min(axis=0)
+        # Determine ideal best and worst (NaN-aware, matching the old
+        # pandas skipna behavior)
+        ideal_best = np.nanmax(matrix, axis=0)
+        ideal_worst = np.nanmin(matrix, axis=0)
 
         # Euclidean Distance calculation
-        distance_to_best = np.sqrt(((weighted_matrix - ideal_best)**2).sum(axis=1))
-        distance_to_worst = np.sqrt(((weighted_matrix - ideal_worst)**2).sum(axis=1))
+        distance_to_best = np.sqrt(np.nansum((matrix - ideal_best) ** 2, axis=1))
+        distance_to_worst = np.sqrt(np.nansum((matrix - ideal_worst) ** 2, axis=1))
 
         # Calculate TOPSIS score
-        topsis_score = distance_to_worst / (distance_to_best + distance_to_worst)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            topsis_score = distance_to_worst / (distance_to_best + distance_to_worst)
 
         # Add score and rank columns
         df = df.assign(topsis_score=topsis_score)
@@ -128,10 +140,10 @@ def display_results(df: pd.DataFrame, selected_indicators: List[str]):
                     hide_index = True
                 )
 
-    # Add export to CSV function
-    csv_buffer = io.StringIO()
-    df[columns_to_display].to_csv(csv_buffer, index=False)
-    st.download_button("Download Results (CSV)", csv_buffer.getvalue(), "eji_analysis_results.csv")
+    # Add export to CSV function; pass bytes so Streamlit skips a second
+    # str->bytes encode of the payload
+    csv_bytes = df[columns_to_display].to_csv(index=False).encode()
+    st.download_button("Download Results (CSV)", csv_bytes, "eji_analysis_results.csv")
 
 
     # Add export to Excel function
@@ -198,10 +210,12 @@ def main():
             # Create UI
             indicator_names = [name for name in INDICATOR_DESCRIPTIONS if name in df.columns]
 
-             # Filter out columns with all NaN values before displaying for selection
+             # Filter out columns with all NaN values before displaying for
+             # selection; one vectorized notna/any pass instead of a
+             # per-indicator full-column scan on every rerun
+            has_data = df[indicator_names].notna().any()
             available_indicators = [
-                indicator for indicator in indicator_names
-                if not df[indicator].isnull().all()
+                indicator for indicator in indicator_names if has_data[indicator]
             ]
 
             # Pre-select indicators based on analysis above
@@ -214,7 +228,10 @@ def main():
                                                 help = "Select indicators to rank by"
                                                 )
 
-            selected_indicators = [name for name, desc in INDICATOR_DESCRIPTIONS.items() if desc in selected_indicators_ui]
+            selected_indicators = [
+                code for desc in selected_indicators_ui
+                for code in CODES_BY_DESCRIPTION.get(desc, [])
+            ]
 
             if st.button("Calculate", help = "Click to compute the environmental justice scores"):
                 with st.spinner("Running Analysis..."):
@@ -0,0 +1,47 @@
+"""One-shot conversion of the EJI CSV to Parquet.
+
+Run once from the repo root:
+
+    python scripts/convert_to_parquet.py
+
+Reads data/CDC_EJI_US.csv, replaces the -999 no-data sentinel with NaN,
+downcasts the numeric indicator columns to float32, derives the 11-digit
+tract GEOID, and writes data/CDC_EJI_US.parquet (snappy compressed).
+The app prefers the Parquet file when it exists, which skips CSV text
+parsing entirely on cold cache loads.
+"""
+import numpy as np
+import pandas as pd
+
+CSV_PATH = 'data/CDC_EJI_US.csv'
+PARQUET_PATH = 'data/CDC_EJI_US.parquet'
+FLOAT_PREFIXES = ('E_', 'EP_', 'EPL_', 'SPL_', 'RPL_')
+
+
+def main():
+    df = pd.read_csv(CSV_PATH)
+    float_cols = [col for col in df.columns if col.startswith(FLOAT_PREFIXES)]
+    df[float_cols] = (
+        df[float_cols]
+        .apply(pd.to_numeric, errors='coerce')
+        .replace(-999, np.nan)
+        .astype('float32')
+    )
+    # Tertile flags are 0/1 counts; -1 marks missing so they fit in int8.
+    flag_cols = [col for col in df.columns if col.startswith('F_')]
+    df[flag_cols] = (
+        df[flag_cols]
+        .apply(pd.to_numeric, errors='coerce')
+        .replace(-999, np.nan)
+        .fillna(-1)
+        .astype('int8')
+    )
+    # Arrow-backed string dtype: compact storage and Arrow hash kernels
+    # when this column is used as a lookup/join key.
+    df['GEOID'] = df['AFFGEOID'].str[-11:].astype('string[pyarrow]')
+    df.to_parquet(PARQUET_PATH, engine='pyarrow', compression='snappy', index=False)
+    print(f"Wrote {PARQUET_PATH} ({len(df)} rows, {len(df.columns)} columns)")
+
+
+if __name__ == '__main__':
+    main()
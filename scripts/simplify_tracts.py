@@ -0,0 +1,45 @@
+"""One-shot simplification of the Census tract boundary shapefiles.
+
+Run once from the repo root (after downloading the raw shapefiles into
+data/tracts/state_XX/):
+
+    python scripts/simplify_tracts.py
+
+For each state the script simplifies the tract geometries in projected
+coordinates (50 m tolerance, topology preserved) and writes a
+FlatGeobuf file at data/tracts/state_XX.fgb. Vertex counts typically
+drop 40-90% with no visible change at viewport resolution, which means
+far fewer path segments for the app to render. The .fgb files are small
+enough to commit, so they can be built once (locally or in CI) and
+shipped as static assets; the app then does a single binary read per
+state instead of touching the raw shapefiles.
+"""
+import glob
+import os
+
+import geopandas as gpd
+
+TRACTS_ROOT = 'data/tracts'
+SIMPLIFY_TOLERANCE_M = 50  # in EPSG:3857 metres
+
+
+def main():
+    for state_dir in sorted(glob.glob(os.path.join(TRACTS_ROOT, 'state_*'))):
+        shapefiles = glob.glob(os.path.join(state_dir, '*.shp'))
+        if not shapefiles:
+            continue
+        shapefile = shapefiles[0]
+        state_code = os.path.basename(state_dir).split('_')[-1]
+        out_path = os.path.join(TRACTS_ROOT, f'state_{state_code}.fgb')
+
+        gdf = gpd.read_file(shapefile)[['GEOID', 'geometry']]
+        orig_crs = gdf.crs
+        gdf = gdf.to_crs(3857)
+        gdf.geometry = gdf.geometry.simplify(SIMPLIFY_TOLERANCE_M, preserve_topology=True)
+        gdf = gdf.to_crs(orig_crs)
+        gdf.to_file(out_path, driver='FlatGeobuf')
+        print(f"Wrote {out_path} ({len(gdf)} tracts)")
+
+
+if __name__ == '__main__':
+    main()